@@ -0,0 +1,96 @@
+"""
+
+Bu modül, video işleme görevlerinin ilerleme ve alarm olaylarını
+Server-Sent Events (SSE) ile istemcilere aktarır. Worker, olayları görev
+bazlı Redis stream'ine yazar; bu endpoint ilgili stream'i okuyarak
+olayları anlık olarak iletir.
+
+Fonksiyonlar:
+- `/tasks/{task_id}/events` (GET): Görevin olaylarını SSE olarak yayınlar.
+  `Last-Event-ID` başlığı ile kopan bağlantı kaldığı yerden devam eder.
+  Görev hiç kuyruğa alınmamışsa ya da stream'in süresi dolmuşsa 404 döner.
+  Stream silindiğinde ya da `TASK_EVENTS_TTL` boyunca hiç olay gelmediğinde
+  bağlantı kapatılır.
+
+"""
+import re
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import StreamingResponse
+from redis import asyncio as aioredis
+from config import REDIS_URL, TASK_EVENTS_PREFIX, TASK_EVENTS_TTL, TASK_QUEUED_PREFIX
+
+redis_conn = aioredis.Redis.from_url(REDIS_URL, decode_responses=True)
+
+router = APIRouter()
+
+STREAM_ID_PATTERN = re.compile(r"0|\d+-\d+")
+
+
+async def event_stream(task_id: str, last_id: str):
+
+    """
+    Görevin Redis stream'ini okuyup SSE formatında olay üretir.
+    "done" olayı alındığında, ne stream ne de kuyruk işareti kaldığında ya da
+    `TASK_EVENTS_TTL` saniye boyunca olay gelmediğinde akış sonlanır.
+
+    Args:
+        task_id (str): Takip edilecek görev kimliği.
+        last_id (str): Okumaya başlanacak son olay kimliği ("0" baştan başlar).
+
+    Yields:
+        str: SSE formatında olay metni.
+    """
+
+    key = f"{TASK_EVENTS_PREFIX}{task_id}"
+    marker = f"{TASK_QUEUED_PREFIX}{task_id}"
+    block_ms = 15000
+    idle_ms = 0
+    while idle_ms < TASK_EVENTS_TTL * 1000:
+        response = await redis_conn.xread({key: last_id}, block=block_ms, count=100)
+        if not response:
+            if not await redis_conn.exists(key, marker):
+                return
+            idle_ms += block_ms
+            yield ": keep-alive\n\n"
+            continue
+
+        idle_ms = 0
+        for _, entries in response:
+            for entry_id, fields in entries:
+                last_id = entry_id
+                event_type = fields.get("type", "message")
+                yield f"id: {entry_id}\nevent: {event_type}\ndata: {fields.get('data', '{}')}\n\n"
+                if event_type == "done":
+                    return
+
+
+@router.get("/tasks/{task_id}/events")
+async def stream_task_events(task_id: str, last_event_id: Optional[str] = Header(default=None)):
+
+    """
+    Görevin ilerleme (`progress`), alarm (`alarm`) ve tamamlanma (`done`) olaylarını SSE olarak döner.
+
+    Args:
+        task_id (str): `/video-task/` tarafından üretilen görev kimliği.
+        last_event_id (str, optional): Yeniden bağlanan istemcinin aldığı son olay kimliği.
+
+    Returns:
+        StreamingResponse: `text/event-stream` formatında olay akışı.
+
+    Raises:
+        HTTPException: `Last-Event-ID` geçersizse 400, görev bulunamazsa 404.
+    """
+
+    last_id = last_event_id or "0"
+    if not STREAM_ID_PATTERN.fullmatch(last_id):
+        raise HTTPException(status_code=400, detail="Geçersiz Last-Event-ID")
+
+    if not await redis_conn.exists(f"{TASK_EVENTS_PREFIX}{task_id}", f"{TASK_QUEUED_PREFIX}{task_id}"):
+        raise HTTPException(status_code=404, detail="Görev bulunamadı")
+
+    return StreamingResponse(
+        event_stream(task_id, last_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -14,6 +14,7 @@ from typing import Optional
 import uuid
 import json
 from datetime import datetime, timezone
+from config import TASK_QUEUED_PREFIX, TASK_QUEUED_TTL
 
 redis_conn = Redis(host="localhost", port=6379, db=0)
 
@@ -49,7 +50,10 @@ async def enqueue_video_task(payload: VideoPayload):
             task_data["origin_time"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
         task_data["task_id"] = str(uuid.uuid4())
-        redis_conn.lpush("video_tasks", json.dumps(task_data))
+        pipe = redis_conn.pipeline()
+        pipe.set(f"{TASK_QUEUED_PREFIX}{task_data['task_id']}", 1, ex=TASK_QUEUED_TTL)
+        pipe.lpush("video_tasks", json.dumps(task_data))
+        pipe.execute()
         return {"status": "queued", "task_id": task_data["task_id"]}
     except Exception as e:
         traceback.print_exc()
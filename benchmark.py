@@ -0,0 +1,147 @@
+"""
+Model Sunucusu Karşılaştırma Betiği
+
+Aynı videoyu N worker süreciyle iki farklı şekilde işler ve sonuçları karşılaştırır:
+- `per-process`: Her worker kendi YOLO modelini yükler.
+- `shared`: Model tek bir `ModelServer` sürecinde yüklenir, worker'lar kareleri
+  paylaşımlı bellek üzerinden gönderir (dynamic batching).
+
+Her mod için raporlanan değerler:
+- `hazır`: Başlangıçtan tüm worker'ların ilk tahmine hazır olmasına kadar geçen süre
+  (süreç açılışı, import ve model yükleme dahil). Soğuk başlangıç karşılaştırması bu değerdir.
+- `FPS`: Tüm worker'lar hazır olduktan sonra (bariyer) başlayan ölçümde toplam
+  işlenen kare/saniye (throughput); model yükleme süresini içermez.
+- `toplam`: Başlangıçtan tüm worker'ların bitişine kadar geçen süre.
+- `bellek`: Tüm süreçlerin (varsa model sunucusu dahil) PSS toplamı. PSS, paylaşılan
+  sayfaları (torch/ultralytics kütüphaneleri, paylaşımlı kare alanı) süreçler arasında
+  bölerek sayar. İşleme bittikten sonra, süreçler kapanmadan önce aynı anda ölçülür
+  (yalnızca Linux, `/proc/<pid>/smaps_rollup`).
+
+Kullanım:
+    python benchmark.py videos/test1.mp4 --workers 4 --frames 300
+"""
+
+import argparse
+import multiprocessing as mp
+import time
+
+import cv2
+
+from utils.video_utils import reduce_overexposed_regions
+from worker.model_server import ModelServer, load_model
+
+CROP_LEFT, CROP_RIGHT = 250, 1750
+
+
+def process_pss_mb(pid):
+
+    """
+    Bir sürecin PSS (Proportional Set Size) değerini /proc üzerinden MB cinsinden okur (yalnızca Linux).
+    """
+
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def run_worker(video_path, max_frames, model_path, device, conf, model_client, barrier, results, release):
+
+    """
+    Model hazır olunca diğer worker'ları bekler, ardından kareleri okuyup tahmin yapar.
+    Hazır olma zamanını, kare sayısını ve ölçüm aralığını sonuç kuyruğuna yazar;
+    bellek ölçümü yapılana kadar kapanmaz.
+    """
+
+    model = load_model(model_path, device) if model_client is None else None
+    cap = cv2.VideoCapture(video_path)
+
+    barrier.wait()
+    start = time.time()
+    frames = 0
+    while frames < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        cropped = reduce_overexposed_regions(frame[:, CROP_LEFT:CROP_RIGHT])
+        if model_client is not None:
+            model_client.detect(cropped, conf=conf)
+        else:
+            model.predict(cropped, conf=conf, verbose=False)
+        frames += 1
+    cap.release()
+    results.put((start, frames, time.time()))
+
+    release.wait()
+    if model_client is not None:
+        model_client.close()
+
+
+def run_mode(args, shared):
+
+    """
+    Seçilen modda worker'ları başlatır ve soğuk başlangıç, throughput ile bellek kullanımını döner.
+    """
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    barrier = ctx.Barrier(args.workers)
+    release = ctx.Event()
+    server = None
+    launch = time.time()
+
+    if shared:
+        server = ModelServer(args.model, args.device, args.workers, conf=args.conf,
+                             max_batch=args.max_batch, max_latency_ms=args.max_latency_ms)
+        server.start()
+
+    workers = [
+        ctx.Process(target=run_worker, args=(args.video, args.frames, args.model, args.device, args.conf,
+                                             server.client(i) if shared else None, barrier, results, release))
+        for i in range(args.workers)
+    ]
+    for w in workers:
+        w.start()
+    stats = [results.get() for _ in workers]
+    wall = time.time() - launch
+
+    pids = [w.pid for w in workers] + ([server.process.pid] if server is not None else [])
+    pss = sum(process_pss_mb(pid) for pid in pids)
+
+    release.set()
+    for w in workers:
+        w.join()
+    if server is not None:
+        server.stop()
+
+    start = min(s[0] for s in stats)
+    total_frames = sum(s[1] for s in stats)
+    return {
+        "ready_s": start - launch,
+        "frames": total_frames,
+        "fps": total_frames / max(max(s[2] for s in stats) - start, 1e-9),
+        "wall_s": wall,
+        "pss_mb": pss,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Paylaşımlı model sunucusu ile süreç başına model karşılaştırması")
+    parser.add_argument("video", help="Test videosu yolu")
+    parser.add_argument("--model", default="detector.pt")
+    parser.add_argument("--device", default=None, help="cuda / cpu (varsayılan: otomatik)")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--frames", type=int, default=300, help="Worker başına işlenecek en fazla kare")
+    parser.add_argument("--conf", type=float, default=0.6)
+    parser.add_argument("--max-batch", type=int, default=8)
+    parser.add_argument("--max-latency-ms", type=float, default=10)
+    args = parser.parse_args()
+
+    for name, shared in (("per-process", False), ("shared", True)):
+        r = run_mode(args, shared)
+        print(f"{name:12s} | hazır {r['ready_s']:.1f} s | {r['frames']} kare | {r['fps']:.1f} FPS | "
+              f"toplam {r['wall_s']:.1f} s | bellek (PSS) {r['pss_mb']:.0f} MB")
@@ -1,4 +1,9 @@
 REDIS_URL = "redis://localhost:6379"
 PROOF_DIR = "proofs/"
 ALARM_CALLBACK_URL = "http://localhost:8000/alarm/"
-VIDEO_DOWNLOAD_DIR = "downloads/"
\ No newline at end of file
+VIDEO_DOWNLOAD_DIR = "downloads/"
+TASK_EVENTS_PREFIX = "task_events:"
+TASK_EVENTS_MAXLEN = 1000
+TASK_EVENTS_TTL = 3600
+TASK_QUEUED_PREFIX = "task_queued:"
+TASK_QUEUED_TTL = 86400
@@ -1,11 +1,13 @@
 from datetime import time
-import torch
+import multiprocessing as mp
+import traceback
 from utils.redis_queue import dequeue_task
 from worker.video_processor import VideoProcessor
+from worker.model_server import ModelServer
 from config import *
 
 settings = {
-    "device": "cuda" if torch.cuda.is_available() else "cpu",
+    "device": None,  # None: CUDA varsa "cuda", yoksa "cpu" (model yüklenirken belirlenir)
     "tray_class": 0,  
     "plate_class": 1, 
     "conf_threshold": 0.6,  
@@ -13,26 +15,68 @@ settings = {
     "crop_right": 1750,  # Görüntünün sağından kırpılacak piksel sayısı
     "stable_confirm_frames": 2,  # Tabak sayısının sabitlenmesi için gereken streak sayısı
     "max_lost": 10,  # Tepsinin kaybolduğunu kesinleştirmek için gereken frame sayısı
+    "progress_every": 30,  # Kaç frame'de bir ilerleme olayı yayınlanacağı
+    "num_workers": 1,  # 1'den büyükse model, worker süreçleri arasında paylaşılan model sunucusunda yüklenir
+    "max_batch": 8,  # Model sunucusunun tek seferde işleyeceği en fazla kare sayısı
+    "max_latency_ms": 10,  # Model sunucusunun batch doldurmak için bekleyeceği en uzun süre
     "show_window": True  
 }
 
-# Video işleyiciyi başlat
-processor = VideoProcessor(
-    model_path="detector.pt",               
-    video_dir=VIDEO_DOWNLOAD_DIR,          
-    proof_dir=PROOF_DIR,                   
-    settings=settings
-)
 
-# Redis kuyruğundan görev al ve işle
-while True:
-    task = dequeue_task()
-    if task:
-        print(f"Video kuyruğundan alındı: {task['video_url']}")
-        processor.process_video_by_url(
-            video_url=task["video_url"],
-            transaction_uuid=task["transaction_uuid"],
-            origin_time=task["origin_time"]
-        )
+def run_worker(model_client=None):
+    # Video işleyiciyi başlat
+    processor = VideoProcessor(
+        model_path="detector.pt",               
+        video_dir=VIDEO_DOWNLOAD_DIR,          
+        proof_dir=PROOF_DIR,                   
+        settings=settings,
+        model_client=model_client
+    )
+
+    # Redis kuyruğundan görev al ve işle
+    while True:
+        task = dequeue_task()
+        if task:
+            print(f"Video kuyruğundan alındı: {task['video_url']}")
+            try:
+                processor.process_video_by_url(
+                    video_url=task["video_url"],
+                    transaction_uuid=task["transaction_uuid"],
+                    origin_time=task["origin_time"],
+                    task_id=task.get("task_id")
+                )
+            except Exception:
+                # Hatalı bir video worker'ı durdurmasın; hata loglanır ve sıradaki göreve geçilir
+                print(f"Görev işlenemedi: {task.get('task_id')}")
+                traceback.print_exc()
+        else:
+            print("Task Bekleniyor.")
+
+
+if __name__ == "__main__":
+    if settings["num_workers"] <= 1:
+        run_worker()
     else:
-        print("Task Bekleniyor.")
+        # Model tek bir sunucu sürecinde yüklenir, worker'lar kareleri paylaşımlı bellekten gönderir
+        server = ModelServer(
+            model_path="detector.pt",
+            device=settings["device"],
+            num_clients=settings["num_workers"],
+            conf=settings["conf_threshold"],
+            max_batch=settings["max_batch"],
+            max_latency_ms=settings["max_latency_ms"]
+        )
+        server.start()
+        ctx = mp.get_context("spawn")
+        workers = [ctx.Process(target=run_worker, args=(server.client(i),))
+                   for i in range(settings["num_workers"])]
+        try:
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+        finally:
+            for w in workers:
+                if w.is_alive():
+                    w.terminate()
+            server.stop()
@@ -1,7 +1,7 @@
 import os
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from api import video_task, alarm_receiver
+from api import video_task, alarm_receiver, task_events
 
 app = FastAPI(title="Cafeteria Counter API")
 
@@ -18,3 +18,4 @@ app.mount("/proofs", StaticFiles(directory=proof_dir), name="proofs")
 # API route'larını ekle
 app.include_router(video_task.router)
 app.include_router(alarm_receiver.router)
+app.include_router(task_events.router)
@@ -2,13 +2,14 @@
 
 Bu modül, video işleme görevlerini Redis üzerinde basit bir iş kuyruğunda
 tutmak için kullanılır. Kuyruğa görev eklemek (`enqueue`) ve kuyruktan
-görev almak (`dequeue`) fonksiyonları içerir.
+görev almak (`dequeue`) fonksiyonları içerir. Ayrıca işlenen görevlerin
+ilerleme ve alarm olaylarını görev bazlı Redis stream'lerine yazar (`publish_event`).
 
 """
 
 import redis
 import json
-from config import REDIS_URL
+from config import REDIS_URL, TASK_EVENTS_PREFIX, TASK_EVENTS_MAXLEN, TASK_EVENTS_TTL, TASK_QUEUED_PREFIX
 
 r = redis.Redis.from_url(REDIS_URL)
 
@@ -38,3 +39,31 @@ def dequeue_task():
         _, raw = task
         return json.loads(raw)
     return None
+
+def publish_event(task_id: str, event_type: str, data: dict):
+
+    """
+    Görevle ilgili bir olayı (ilerleme, alarm, tamamlanma) görevin Redis stream'ine ekler.
+    Stream uzunluğu `TASK_EVENTS_MAXLEN` ile sınırlanır ve `TASK_EVENTS_TTL` saniye sonra silinir.
+    "done" olayında görevin kuyrukta bekleme işareti (`TASK_QUEUED_PREFIX`) silinir.
+
+    Args:
+        task_id (str): Olayın ait olduğu görev kimliği.
+        event_type (str): Olay tipi ("progress", "alarm", "done").
+        data (dict): Olay içeriği (JSON olarak saklanır).
+    """
+
+    if not task_id:
+        return
+
+    key = f"{TASK_EVENTS_PREFIX}{task_id}"
+    try:
+        pipe = r.pipeline()
+        pipe.xadd(key, {"type": event_type, "data": json.dumps(data)},
+                  maxlen=TASK_EVENTS_MAXLEN, approximate=True)
+        pipe.expire(key, TASK_EVENTS_TTL)
+        if event_type == "done":
+            pipe.delete(f"{TASK_QUEUED_PREFIX}{task_id}")
+        pipe.execute()
+    except redis.RedisError as e:
+        print(f"Olay yayınlanamadı: {e}")
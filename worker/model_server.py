@@ -0,0 +1,316 @@
+"""
+Paylaşımlı Model Sunucusu
+
+Bu modül, YOLO modelini tek bir süreçte yükleyip aynı makinedeki birden fazla
+worker sürecinin bu modeli ortak kullanmasını sağlar. Böylece her worker kendi
+model kopyasını yüklemez; RAM/VRAM kullanımı ve soğuk başlangıç süresi azalır.
+Worker tarafı torch/ultralytics import etmez.
+
+Çalışma şekli:
+- Her worker, `multiprocessing.shared_memory` üzerinde ilk karesinin boyutunda
+  tek karelik bir alan açar; daha büyük bir kare gelirse alan yeniden açılır.
+  Worker her seferinde tek bir istek gönderir ve cevabı bekler.
+- Worker kareyi bu alana yazar ve istek kuyruğuna yalnızca
+  (client_id, shm_name, shape) bilgisini gönderir; kare verisi kuyruktan geçmez.
+- Sunucu, kareyi doğrudan paylaşımlı bellekten okur (zero-copy) ve farklı
+  worker'lardan gelen istekleri `max_batch` dolana ya da `max_latency_ms`
+  süresi dolana kadar toplayıp tek seferde modele verir (dynamic batching).
+- Tespitler (x1, y1, x2, y2, conf, cls) dizisi olarak worker'ın cevap
+  kuyruğuna geri gönderilir. Hatalı bir batch'te her worker'a hata mesajı döner.
+- Sunucu süreci kapanırsa worker'lar bunu bir pipe üzerinden fark eder ve
+  sonsuza kadar beklemek yerine `RuntimeError` fırlatır.
+"""
+
+import gc
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import numpy as np
+
+POLL_INTERVAL = 1.0
+
+
+def load_model(model_path, device=None):
+
+    """
+    YOLO modelini yükler. torch/ultralytics yalnızca bu fonksiyon çağrıldığında import edilir.
+
+    Args:
+        model_path (str): YOLO model dosya yolu.
+        device (str, optional): "cuda" / "cpu". Verilmezse CUDA varsa cuda, yoksa cpu kullanılır.
+
+    Returns:
+        YOLO: Yüklenmiş model.
+    """
+
+    import torch
+    from ultralytics import YOLO
+
+    if device is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    return YOLO(model_path).to(device)
+
+
+def _close_buffers(buffers):
+
+    """
+    Paylaşımlı bellek bağlantılarını kapatmayı dener; hâlâ view tutulanları listede bırakır.
+
+    Args:
+        buffers (list): Kapatılacak `SharedMemory` nesneleri (yerinde güncellenir).
+    """
+
+    for shm in list(buffers):
+        try:
+            shm.close()
+            buffers.remove(shm)
+        except BufferError:
+            pass
+
+
+def _serve(model_path, device, conf, max_batch, max_latency_ms, requests, responses, ready, alive):
+
+    """
+    Model sunucusu sürecinin ana döngüsü. Modeli yükler, istekleri toplar ve toplu tahmin yapar.
+
+    Args:
+        model_path (str): YOLO model dosya yolu.
+        device (str): Modelin çalışacağı cihaz (None ise otomatik seçilir).
+        conf (float): Sunucu tarafında uygulanan en düşük güven eşiği.
+        max_batch (int): Tek seferde modele verilecek en fazla kare sayısı.
+        max_latency_ms (float): İlk istekten sonra batch için beklenecek en uzun süre (ms).
+        requests (mp.Queue): (client_id, shm_name, shape) isteklerinin geldiği kuyruk.
+        responses (list): Her worker'a ait cevap kuyrukları.
+        ready (mp.Queue): Model yüklendiğinde None, yüklenemezse hata mesajı gönderilen kuyruk.
+        alive (Connection): Yalnızca bu süreçte açık tutulan pipe ucu; süreç kapanınca worker'lar fark eder.
+    """
+
+    try:
+        model = load_model(model_path, device)
+    except Exception as e:
+        traceback.print_exc()
+        ready.put(f"{type(e).__name__}: {e}")
+        return
+
+    # Worker başına bağlanılan paylaşımlı bellek; alanı değişen worker'ın eskisi `retired` listesine alınır
+    buffers = {}
+    retired = []
+    ready.put(None)
+    print(f"Model sunucusu hazır: {model_path} ({model.device}), {len(responses)} worker")
+
+    running = True
+    while running:
+        req = requests.get()
+        if req is None:
+            break
+
+        batch = [req]
+        deadline = time.monotonic() + max_latency_ms / 1000
+        while len(batch) < max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                req = requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if req is None:
+                running = False
+                break
+            batch.append(req)
+
+        for cid, name, _ in batch:
+            if cid not in buffers or buffers[cid].name != name:
+                if cid in buffers:
+                    retired.append(buffers[cid])
+                buffers[cid] = shared_memory.SharedMemory(name=name)
+
+        frames = [np.ndarray(shape, dtype=np.uint8, buffer=buffers[cid].buf) for cid, _, shape in batch]
+        results = None
+        try:
+            results = model.predict(frames, conf=conf, verbose=False)
+            replies = [(result.boxes.data.cpu().numpy().copy(), None) for result in results]
+        except Exception as e:
+            traceback.print_exc()
+            replies = [(None, f"{type(e).__name__}: {e}")] * len(batch)
+        del frames, results
+
+        for (cid, _, _), reply in zip(batch, replies):
+            responses[cid].put(reply)
+        _close_buffers(retired)
+
+    # Predictor son batch'in karelerine (paylaşımlı bellek view'larına) referans tutar
+    model.predictor = None
+    del model
+    gc.collect()
+    _close_buffers(retired + list(buffers.values()))
+    alive.close()
+
+
+class ModelServer:
+
+    """
+    YOLO modelini ayrı bir süreçte barındıran ve worker'lara `ModelClient` dağıtan sınıf.
+
+    Args:
+        model_path (str): YOLO model dosya yolu.
+        device (str): Modelin çalışacağı cihaz (None ise otomatik seçilir).
+        num_clients (int): Modeli paylaşacak worker sayısı.
+        conf (float): Sunucu tarafında uygulanan en düşük güven eşiği.
+        max_batch (int): Tek seferde modele verilecek en fazla kare sayısı.
+        max_latency_ms (float): Batch doldurmak için beklenecek en uzun süre (ms).
+    """
+
+    def __init__(self, model_path, device, num_clients, conf=0.25, max_batch=8, max_latency_ms=10):
+        self.model_path = model_path
+        self.device = device
+        self.num_clients = num_clients
+        self.conf = conf
+        self.max_batch = max_batch
+        self.max_latency_ms = max_latency_ms
+        self.process = None
+        self.requests = None
+        self.responses = []
+        self.alive = None
+
+    def start(self):
+
+        """
+        Sunucu sürecini başlatır ve model yüklenene kadar bekler.
+
+        Raises:
+            RuntimeError: Model yüklenemezse veya sunucu süreci beklenmedik şekilde kapanırsa.
+        """
+
+        ctx = mp.get_context("spawn")
+        self.requests = ctx.Queue()
+        self.responses = [ctx.Queue() for _ in range(self.num_clients)]
+        ready = ctx.Queue()
+        self.alive, alive_w = ctx.Pipe(duplex=False)
+
+        self.process = ctx.Process(
+            target=_serve,
+            args=(self.model_path, self.device, self.conf, self.max_batch, self.max_latency_ms,
+                  self.requests, self.responses, ready, alive_w),
+            daemon=True
+        )
+        self.process.start()
+        alive_w.close()
+
+        while True:
+            try:
+                error = ready.get(timeout=POLL_INTERVAL)
+                break
+            except queue.Empty:
+                if not self.process.is_alive():
+                    error = f"süreç kapandı (çıkış kodu {self.process.exitcode})"
+                    break
+
+        if error is not None:
+            self.stop()
+            raise RuntimeError(f"Model sunucusu başlatılamadı: {error}")
+
+    def client(self, client_id):
+
+        """
+        Belirtilen worker için sunucuya bağlı bir istemci üretir. İstemci başka bir sürece aktarılabilir.
+
+        Args:
+            client_id (int): Worker sırası (0 ile num_clients - 1 arasında).
+
+        Returns:
+            ModelClient: Worker'ın kullanacağı istemci.
+        """
+
+        return ModelClient(client_id, self.requests, self.responses[client_id], self.alive)
+
+    def stop(self):
+
+        """
+        Sunucu sürecini durdurur.
+        """
+
+        if self.process is not None:
+            if self.process.is_alive():
+                self.requests.put(None)
+                self.process.join(timeout=10)
+            if self.process.is_alive():
+                self.process.terminate()
+            self.process = None
+
+
+class ModelClient:
+
+    """
+    Worker tarafında model sunucusuna kare gönderen istemci. Kare alanı (paylaşımlı bellek)
+    istemciye aittir; ilk karede açılır, daha büyük bir kare gelince yeniden açılır.
+
+    Args:
+        client_id (int): Worker sırası.
+        requests (mp.Queue): Sunucunun istek kuyruğu.
+        responses (mp.Queue): Bu worker'a ait cevap kuyruğu.
+        alive (Connection): Sunucu kapandığında okunabilir hale gelen pipe ucu.
+    """
+
+    def __init__(self, client_id, requests, responses, alive):
+        self.client_id = client_id
+        self.requests = requests
+        self.responses = responses
+        self.alive = alive
+        self._shm = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shm"] = None
+        return state
+
+    def detect(self, frame, conf=0.25):
+
+        """
+        Kareyi paylaşımlı belleğe yazar ve sunucudan tespitleri bekler.
+
+        Args:
+            frame (np.ndarray): BGR formatında görüntü.
+            conf (float): Güven eşiği; sunucunun eşiğinden düşük olamaz.
+
+        Returns:
+            np.ndarray: (N, 6) boyutunda (x1, y1, x2, y2, conf, cls) tespit dizisi.
+
+        Raises:
+            RuntimeError: Sunucu tahmin hatası döndürürse veya sunucu süreci kapanırsa.
+        """
+
+        if self._shm is None or frame.nbytes > self._shm.size:
+            self.close()
+            self._shm = shared_memory.SharedMemory(create=True, size=max(frame.nbytes, 1))
+
+        view = np.ndarray(frame.shape, dtype=np.uint8, buffer=self._shm.buf)
+        view[...] = frame
+        del view
+
+        self.requests.put((self.client_id, self._shm.name, frame.shape))
+        while True:
+            try:
+                boxes, error = self.responses.get(timeout=POLL_INTERVAL)
+                break
+            except queue.Empty:
+                if self.alive.poll():
+                    raise RuntimeError("Model sunucusu beklenmedik şekilde kapandı.")
+
+        if error is not None:
+            raise RuntimeError(f"Model sunucusu tahmin hatası: {error}")
+        return boxes[boxes[:, 4] >= conf]
+
+    def close(self):
+
+        """
+        Kare alanını kapatır ve siler. Sunucu bağlıysa bellek, sunucu da bırakınca serbest kalır.
+        """
+
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 import os
 import tempfile
+import time
 import cv2
 import json
 import requests
@@ -8,7 +9,8 @@ from pathlib import Path
 from worker.tray import Tray
 from utils.video_utils import compute_iou, get_category, reduce_overexposed_regions, save_alarm
 from utils.video_utils import get_category
-from ultralytics import YOLO
+from utils.redis_queue import publish_event
+from worker.model_server import load_model
 from config import ALARM_CALLBACK_URL
 import threading
 
@@ -23,46 +25,56 @@ class VideoProcessor:
         video_dir (str): Video klasör yolu.
         proof_dir (str): Alarm görüntülerinin kaydedileceği klasör yolu.
         settings (dict): Cihaz, eşik, sınıf ID'leri ve parametreleri içeren yapılandırma.
+        model_client (ModelClient, optional): Paylaşımlı model sunucusu istemcisi. Verilirse
+            model (ve torch) bu süreçte yüklenmez, tahminler model sunucusundan alınır.
     """
 
-    def __init__(self, model_path, video_dir, proof_dir, settings):
-        self.model = YOLO(model_path).to(settings["device"])
+    def __init__(self, model_path, video_dir, proof_dir, settings, model_client=None):
+        self.model_client = model_client
+        self.model = load_model(model_path, settings["device"]) if model_client is None else None
         self.video_dir = Path(video_dir)
         self.proof_dir = Path(proof_dir)
         self.settings = settings
         self.tray_counter = 1
 
-    def process_video(self, video_path, transaction_uuid=None, origin_time=None):
+    def process_video(self, video_path, transaction_uuid=None, origin_time=None, task_id=None):
 
         """
         Video dosyasını okur, kareleri işler, tepsi ve tabak tespiti yapar.
+        `task_id` verilirse ilerleme ve alarm olayları görevin Redis stream'ine yayınlanır.
 
         Args:
             video_path (Path): İşlenecek video dosyasının yolu.
             transaction_uuid (str, optional): Görevle ilişkilendirilen benzersiz işlem kimliği.
             origin_time (str, optional): Görevin başlatıldığı zaman.
+            task_id (str, optional): Olayların yayınlanacağı görev kimliği.
         """
 
         cap = cv2.VideoCapture(str(video_path))
         trays= {}
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        frames_done = 0
+        start_time = time.monotonic()
+        progress_every = self.settings.get("progress_every", 30)
         print(f"\nVideo işleniyor: {video_path.name}")
 
         while cap.isOpened():
             ret, frame = cap.read()
             if not ret:
                 break
+            frames_done += 1
 
             cropped = reduce_overexposed_regions(frame[:, self.settings["crop_left"]:self.settings["crop_right"]])
-            result = self.model.predict(cropped, conf=self.settings["conf_threshold"], verbose=False)[0]
+            detections = self.detect(cropped)
 
-            tray_boxes, plate_centers = self.extract_detections(result)
+            tray_boxes, plate_centers = self.extract_detections(detections)
             matched_ids = self.update_trays(trays, tray_boxes)
             self.tray_counter += len(set(matched_ids) - trays.keys())
 
             for tid in list(trays.keys()):
                 tray = trays[tid]
                 if tid not in matched_ids:
-                    self.handle_lost_tray(tray, tid, video_path, transaction_uuid, origin_time)
+                    self.handle_lost_tray(tray, tid, video_path, transaction_uuid, origin_time, task_id)
                 else:
                     count = self.count_plates_in_tray(tray.box, plate_centers)
                     tray.update(count, frame)
@@ -70,27 +82,72 @@ class VideoProcessor:
             if self.settings["show_window"]:
                 self.display_frame(frame, trays)
 
-        self.finalize_unalarmed(trays, video_path, transaction_uuid, origin_time)
+            if progress_every > 0 and frames_done % progress_every == 0:
+                self.publish_progress(task_id, frames_done, total_frames, start_time)
+
+        self.finalize_unalarmed(trays, video_path, transaction_uuid, origin_time, task_id)
         cap.release()
+        self.publish_progress(task_id, frames_done, total_frames, start_time)
+        publish_event(task_id, "done", {"frames_done": frames_done})
         print(f"Video tamamlandı: {video_path.name}")
         cv2.destroyAllWindows()
 
-    def extract_detections(self, result):
+    def publish_progress(self, task_id, frames_done, total_frames, start_time):
+
+        """
+        İşlenen kare sayısı, FPS ve tahmini kalan süreyi görevin Redis stream'ine yayınlar.
+
+        Args:
+            task_id (str): Görev kimliği.
+            frames_done (int): Şu ana kadar işlenen kare sayısı.
+            total_frames (int): Videodaki toplam kare sayısı (bilinmiyorsa 0).
+            start_time (float): İşlemin başladığı `time.monotonic()` değeri.
+        """
+
+        elapsed = time.monotonic() - start_time
+        fps = frames_done / elapsed if elapsed > 0 else 0.0
+        remaining = max(total_frames - frames_done, 0)
+        eta = remaining / fps if fps > 0 and total_frames > 0 else None
+        publish_event(task_id, "progress", {
+            "frames_done": frames_done,
+            "total_frames": total_frames,
+            "fps": round(fps, 2),
+            "eta_seconds": round(eta, 1) if eta is not None else None
+        })
+
+    def detect(self, frame):
+
+        """
+        Kırpılmış kare üzerinde tespit yapar. Model sunucusu istemcisi varsa tahmin oradan alınır.
+
+        Args:
+            frame (np.ndarray): Kırpılmış ve ışığı düzeltilmiş video karesi.
 
+        Returns:
+            np.ndarray: (N, 6) boyutunda (x1, y1, x2, y2, conf, cls) tespit dizisi.
         """
-        YOLO çıktısından tepsi ve tabak tespitlerini ayıklar.
+
+        if self.model_client is not None:
+            return self.model_client.detect(frame, conf=self.settings["conf_threshold"])
+        result = self.model.predict(frame, conf=self.settings["conf_threshold"], verbose=False)[0]
+        return result.boxes.data.cpu().numpy()
+
+    def extract_detections(self, detections):
+
+        """
+        YOLO tespitlerinden tepsi ve tabak tespitlerini ayıklar.
 
         Args:
-            result (YOLO.Result): YOLO modelinin döndürdüğü sonuç nesnesi.
+            detections (np.ndarray): (N, 6) boyutunda (x1, y1, x2, y2, conf, cls) tespit dizisi.
 
         Returns:
             tuple: [(x1, y1, x2, y2)] formatında tepsi box'ları ve [(cx, cy)] formatında tabak merkezleri listesi.
         """
 
         trays, plates = [], []
-        for r in result.boxes:
-            cls = int(r.cls[0])
-            x1, y1, x2, y2 = map(int, r.xyxy[0])
+        for det in detections:
+            cls = int(det[5])
+            x1, y1, x2, y2 = map(int, det[:4])
             x1 += self.settings["crop_left"]
             x2 += self.settings["crop_left"]
             if cls == self.settings["tray_class"]:
@@ -126,7 +183,7 @@ class VideoProcessor:
                 self.tray_counter += 1
         return matched
 
-    def handle_lost_tray(self, tray, tid, video_path, transaction_uuid, origin_time):
+    def handle_lost_tray(self, tray, tid, video_path, transaction_uuid, origin_time, task_id=None):
         
         """
         Görüntüden kaybolan ve alarm durumu oluşabilecek tepsileri işler.
@@ -137,14 +194,15 @@ class VideoProcessor:
             video_path (Path): İşlenen video yolu.
             transaction_uuid (str): Görev kimliği.
             origin_time (str): Görevin başlangıç zamanı.
+            task_id (str, optional): Olayların yayınlanacağı görev kimliği.
         """
         
         tray.lost += 1
         if tray.lost > self.settings["max_lost"] and not tray.alarmed and tray.image is not None:
-            self.save_proof(tray, tid, video_path, transaction_uuid, origin_time)
+            self.save_proof(tray, tid, video_path, transaction_uuid, origin_time, task_id=task_id)
             tray.alarmed = True
 
-    def finalize_unalarmed(self, trays, video_path, transaction_uuid, origin_time):
+    def finalize_unalarmed(self, trays, video_path, transaction_uuid, origin_time, task_id=None):
 
         """
         Videonun sonunda alarm verememiş ama görüntüsü alınmış tüm tepsileri işler.
@@ -154,11 +212,12 @@ class VideoProcessor:
             video_path (Path): Video dosyasının yolu.
             transaction_uuid (str): Görev kimliği.
             origin_time (str): Görevin başlatıldığı zaman.
+            task_id (str, optional): Olayların yayınlanacağı görev kimliği.
         """
 
         for tid, tray in trays.items():
             if not tray.alarmed and tray.image is not None:
-                self.save_proof(tray, tid, video_path, transaction_uuid, origin_time, closing=True)
+                self.save_proof(tray, tid, video_path, transaction_uuid, origin_time, closing=True, task_id=task_id)
 
     def count_plates_in_tray(self, box, plate_centers):
 
@@ -176,7 +235,7 @@ class VideoProcessor:
         x1, y1, x2, y2 = box
         return sum(1 for cx, cy in plate_centers if x1 <= cx <= x2 and y1 <= cy <= y2)
 
-    def save_proof(self, tray, tid, video_path, transaction_uuid=None, origin_time=None, closing=False):
+    def save_proof(self, tray, tid, video_path, transaction_uuid=None, origin_time=None, closing=False, task_id=None):
 
         """
         Alarm durumu oluştuğunda (veya kapanışta) görüntüyü kaydeder ve webhook'a alarm verisi gönderir.
@@ -188,6 +247,7 @@ class VideoProcessor:
             transaction_uuid (str): Görev kimliği.
             origin_time (str): Başlangıç zamanı.
             closing (bool): Kapanışta mı kayıt alındığını belirtir.
+            task_id (str, optional): Alarmın yayınlanacağı görev kimliği.
         """
 
         cat = get_category(tray.max_count)
@@ -217,6 +277,7 @@ class VideoProcessor:
             }
 
             print("Alarm JSON:", json.dumps(alarm_payload, indent=2))
+            publish_event(task_id, "alarm", alarm_payload)
             threading.Thread(target=self.send_alarm_async, args=(alarm_payload,), daemon=True).start()
             threading.Thread(target=save_alarm, args=(alarm_payload,), daemon=True).start()
 
@@ -255,7 +316,7 @@ class VideoProcessor:
             print(f"Video indirilemedi: {e}")
             return False
 
-    def process_video_by_url(self, video_url: str, transaction_uuid: str, origin_time: str):
+    def process_video_by_url(self, video_url: str, transaction_uuid: str, origin_time: str, task_id: str = None):
         """
         URL'den video dosyasını indirir, geçici dosyaya yazar ve işleme başlatır.
         """
@@ -264,10 +325,15 @@ class VideoProcessor:
 
         if not self.download_video(video_url, temp_video_path):
             print("Video indirilemedi, işlem iptal edildi.")
+            publish_event(task_id, "done", {"error": "download_failed"})
             return
 
         try:
-            self.process_video(Path(temp_video_path), transaction_uuid=transaction_uuid, origin_time=origin_time)
+            self.process_video(Path(temp_video_path), transaction_uuid=transaction_uuid,
+                               origin_time=origin_time, task_id=task_id)
+        except Exception as e:
+            publish_event(task_id, "done", {"error": str(e)})
+            raise
         finally:
             if os.path.exists(temp_video_path):
                 os.remove(temp_video_path)